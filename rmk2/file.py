@@ -1,13 +1,123 @@
 import datetime
+import functools
 import json
 import logging
+import math
+import operator
 import os
 from enum import Enum
-from typing import Iterator, Union, Any
+from typing import Callable, Iterable, Iterator, Union, Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Build the encoders once, since json.dumps creates a new one per call for
+# non-default arguments. Use orjson's separators and write non-ASCII as UTF-8 like
+# orjson, falling back to escaped ASCII for strings that cannot be encoded as UTF-8
+# (lone surrogates), like json did before
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_encode_ascii = json.JSONEncoder(separators=(",", ":")).encode
+
+_CONTAINERS = (dict, list, tuple)
+
+# Maps digits to b"0" and everything else to b" ", to find long runs of digits
+_DIGITS = bytes(ord("0") if chr(i).isdigit() else ord(" ") for i in range(256))
+
+# Integers outside 64 bits, which orjson reads back as floats
+_LARGE_INT = b"0" * 19
+
+
+def _has_nonfinite(obj: Union[dict, list, tuple]) -> bool:
+    """Check whether a container holds NaN or infinite floats, at any depth
+
+    Only values that are floats or containers are inspected individually, so rows
+    without either are checked by a single pass over their value types"""
+    values = obj.values() if isinstance(obj, dict) else obj
+
+    for _type in set(map(type, values)):
+        if issubclass(_type, float):
+            if not all(math.isfinite(v) for v in values if type(v) is _type):
+                return True
+        elif issubclass(_type, _CONTAINERS):
+            if any(_has_nonfinite(v) for v in values if type(v) is _type):
+                return True
+
+    return False
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialise an object to JSON bytes using the json module"""
+    try:
+        return _encode(obj).encode("utf-8")
+    except UnicodeEncodeError:
+        return _encode_ascii(obj).encode("ascii")
+
+
+def _orjson_dumps(obj: Any) -> bytes:
+    """Serialise an object to JSON bytes using orjson
+
+    Falls back to json for input that orjson rejects (e.g. non-str keys, integers
+    outside 64 bits, nested dates) and for NaN/infinity, which orjson silently
+    writes as null. Unlike json, orjson serialises uuid.UUID and enum.Enum values"""
+    try:
+        data = orjson.dumps(obj, option=_ORJSON_OPTIONS)
+    except TypeError:
+        return _json_dumps(obj)
+
+    # NaN/infinity are written as null, so a row can only contain them if it has
+    # more nulls than top-level None values (strings containing "null" or nested
+    # None values only cause an unnecessary check)
+    if b"null" in data:
+        values = obj.values() if isinstance(obj, dict) else obj
+        if data.count(b"null") > operator.countOf(values, None) and _has_nonfinite(obj):
+            return _json_dumps(obj)
+
+    return data
+
+
+def _orjson_loads(line: bytes) -> Any:
+    """Parse a JSON line using orjson
+
+    Falls back to json for NaN/infinity, which orjson does not accept"""
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return json.loads(line)
+
+
+def _orjson_loads_exact(line: bytes) -> Any:
+    """Parse a JSON line using orjson, keeping integers outside 64 bits exact
+
+    Lines with 19 or more consecutive digits are parsed with json instead, since
+    orjson reads such integers as floats"""
+    if _LARGE_INT in line.translate(_DIGITS):
+        return json.loads(line)
+
+    return _orjson_loads(line)
+
+
+if orjson is not None:
+    # Leave dates and dataclasses to json, which rejects them like it did before.
+    # Non-str keys are rejected by orjson, so json also writes those rows, which
+    # keeps rejecting date keys
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    _dumps = _orjson_dumps
+    _loads = _orjson_loads
+    _loads_exact = _orjson_loads_exact
+else:
+    _dumps = _json_dumps
+    _loads = json.loads
+    _loads_exact = json.loads
+
 
 Expected = Union[bool, str, int, float, datetime.date, datetime.datetime, None]
 Jsonified = Union[bool, str, int, float, None]
 
+_BUFFER_SIZE = 1 << 20
+
 
 class WriteMode(Enum):
     APPEND = "a"
@@ -15,15 +125,91 @@ class WriteMode(Enum):
     TRUNCATE = "w"
 
 
-def _jsonify_types(row: dict[str, Expected]) -> dict[str, Jsonified]:
-    """Cast types that are not supported by JSON to more compatible types"""
-    _castable_types = {
-        datetime.date: lambda x: x.isoformat(),
-        datetime.datetime: lambda x: x.isoformat(timespec="microseconds"),
-        datetime.timedelta: lambda x: str(x),
-    }
+_CASTABLE = (datetime.date, datetime.timedelta)
+
+
+def _cast(value: Expected) -> Jsonified:
+    """Cast a single value that is not supported by JSON to a compatible type
+
+    datetime is a subclass of date, so it needs to be checked first"""
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(timespec="microseconds")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    return value
+
+
+@functools.lru_cache(maxsize=1024, typed=True)
+def _isoformat_date(value: datetime.date) -> str:
+    """Format a date, caching results for dates that repeat across rows"""
+    return value.isoformat()
+
+
+@functools.lru_cache(maxsize=1024, typed=True)
+def _isoformat_datetime(value: datetime.datetime, utcoffset: Any) -> str:
+    """Format a datetime, caching results for datetimes that repeat across rows
+
+    Aware datetimes in different time zones compare equal if they refer to the same
+    instant, so utcoffset needs to be part of the cache key"""
+    return value.isoformat(timespec="microseconds")
+
+
+def _cast_cached(value: Expected) -> Jsonified:
+    """Cast a single value like _cast, caching formatted dates and datetimes
+
+    A cache hit is about 4x faster than formatting, but a miss is slower (dates
+    about 3x, datetimes about 1.25x), so this only pays off if values repeat"""
+    if isinstance(value, datetime.datetime):
+        return _isoformat_datetime(value, value.utcoffset())
+    if isinstance(value, datetime.date):
+        return _isoformat_date(value)
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    return value
+
+
+def _jsonify_types(
+    row: dict[str, Expected], cast: Callable = _cast
+) -> dict[str, Jsonified]:
+    """Cast types that are not supported by JSON to more compatible types
+
+    Returns the row unchanged if none of its values need to be cast"""
+    if not any(isinstance(v, _CASTABLE) for v in row.values()):
+        return row
+
+    return {k: cast(v) if isinstance(v, _CASTABLE) else v for k, v in row.items()}
 
-    return {k: _castable_types.get(type(v), lambda x: x)(v) for k, v in row.items()}
+
+def _jsonify_pairs(
+    pairs: list[tuple[str, Expected]], cast: Callable = _cast
+) -> dict[str, Jsonified]:
+    """Build a dict from key/value pairs, casting types like _jsonify_types
+
+    Combines dict(pairs) and _jsonify_types() into a single pass"""
+    return {k: cast(v) if isinstance(v, _CASTABLE) else v for k, v in pairs}
+
+
+def _serialise_rows(
+    data: Iterable[Union[list[tuple[str, Any]], dict[str, Any]]],
+    cast_types: bool = True,
+    cache_dates: bool = False,
+) -> Iterator[bytes]:
+    """Serialise rows into newline-terminated JSON, one row at a time"""
+    # Bind functions locally to avoid global/attribute lookups inside the loop
+    dumps = _dumps
+    jsonify = _jsonify_types
+    jsonify_pairs = _jsonify_pairs
+    cast = _cast_cached if cache_dates else _cast
+
+    for line in data:
+        if isinstance(line, dict):
+            yield dumps(jsonify(line, cast) if cast_types else line) + b"\n"
+        elif isinstance(line, list) and isinstance(line[0], tuple):
+            yield dumps(jsonify_pairs(line, cast) if cast_types else dict(line)) + b"\n"
+        else:
+            raise ValueError("Data must be a list of key/value pairs")
 
 
 def write_jsonl(
@@ -31,8 +217,24 @@ def write_jsonl(
     prefix: str,
     filename: str,
     mode: WriteMode = WriteMode.CREATE,
+    buffer_size: int = _BUFFER_SIZE,
+    cast_types: bool = True,
+    cache_dates: bool = False,
 ) -> None:
-    """Write serialised data to a given path/file"""
+    """Write serialised data to a given path/file
+
+    Uses orjson for serialisation if it is installed, otherwise falls back to json.
+    Both write the same output, except that orjson also accepts uuid.UUID and
+    enum.Enum values, which json rejects. buffer_size sets the size of the file
+    buffer in bytes.
+
+    If cast_types is unset, rows are serialised as-is, skipping the conversion of
+    dates, datetimes and timedeltas; callers must then only pass JSON-native values
+    (bool, str, int, float, None).
+
+    If cache_dates is set, formatted dates and datetimes are cached, which speeds
+    up inputs where the same values repeat across rows (e.g. a partition date), but
+    slows down inputs with mostly unique values"""
     path = os.path.join(prefix, filename)
 
     try:
@@ -40,20 +242,12 @@ def write_jsonl(
             mode, WriteMode
         ), f"Mode needs to be one of {[x.name for x in WriteMode]}"
 
-        with open(path, mode=mode.value, encoding="utf-8") as outfile:
-            logging.debug(f"Writing serialised data, {path=}")
+        with open(path, mode=mode.value + "b", buffering=buffer_size) as outfile:
+            logging.debug("Writing serialised data, path=%r", path)
 
-            for line in data:
-                if isinstance(line, dict):
-                    _line = line
-                elif isinstance(line, list) and isinstance(line[0], tuple):
-                    _line = dict(line)
-                else:
-                    raise ValueError("Data must be a list of key/value pairs")
-
-                # Add OS-specific newline after each row
-                outfile.write(json.dumps(dict(_jsonify_types(_line))))
-                outfile.write(os.linesep)
+            # Rows before an invalid row are still written, as the generator only
+            # raises once it reaches that row
+            outfile.writelines(_serialise_rows(data, cast_types, cache_dates))
 
     except (AssertionError, FileExistsError) as e:
         logging.error(str(e))
@@ -61,16 +255,23 @@ def write_jsonl(
 
 
 def read_jsonl(
-    prefix: str, filename: str
+    prefix: str,
+    filename: str,
+    buffer_size: int = _BUFFER_SIZE,
+    exact_ints: bool = False,
 ) -> Union[Iterator, list[list[tuple[str, Jsonified]]]]:
-    """Read JSONL serialised data from a given path/file"""
+    """Read JSONL serialised data from a given path/file
+
+    buffer_size sets the size of the file buffer in bytes. orjson, if installed,
+    reads integers outside 64 bits as floats; if exact_ints is set, lines that may
+    contain such integers are parsed with json instead, which slows down reading"""
     path = os.path.join(prefix, filename)
 
     try:
-        with open(path, mode="r", encoding="utf-8") as infile:
-            logging.debug(f"Reading serialised data, {path=}")
+        with open(path, mode="rb", buffering=buffer_size) as infile:
+            logging.debug("Reading serialised data, path=%r", path)
 
-            yield from iter(json.loads(line) for line in infile)
+            yield from map(_loads_exact if exact_ints else _loads, infile)
 
     except FileNotFoundError as e:
         logging.error(str(e))
@@ -82,19 +283,30 @@ def delete_file(prefix: str, filename: str) -> None:
     path = os.path.join(prefix, filename)
 
     try:
-        logging.debug(f"Deleting serialised data, {path=}")
+        logging.debug("Deleting serialised data, path=%r", path)
         os.remove(path)
     except FileNotFoundError as e:
         logging.error(str(e))
         raise e
 
 
-def count_file(prefix: str, filename: str) -> int:
-    """Count number of lines in a given path/file"""
-    _idx = 0
+def count_file(prefix: str, filename: str, buffer_size: int = _BUFFER_SIZE) -> int:
+    """Count number of lines in a given path/file
+
+    Reads the file in blocks of buffer_size bytes, which needs to be positive"""
+    if buffer_size <= 0:
+        raise ValueError(f"buffer_size needs to be positive, {buffer_size=}")
+
+    _count = 0
+    _chunk = b""
+
+    with open(os.path.join(prefix, filename), mode="rb", buffering=0) as infile:
+        while chunk := infile.read(buffer_size):
+            _count += chunk.count(b"\n")
+            _chunk = chunk
 
-    with open(os.path.join(prefix, filename), mode="rb") as infile:
-        for _idx, _ in enumerate(infile, start=1):
-            pass
+    # Count a trailing line that is not terminated by a newline
+    if _chunk and not _chunk.endswith(b"\n"):
+        _count += 1
 
-        return _idx
+    return _count
@@ -1,54 +1,199 @@
 import datetime
+import functools
 import hashlib
 import logging
+import subprocess
+import sys
 from enum import Enum
-from typing import Any
+from typing import Any, Callable, Iterable, Sequence, Union
+
+try:
+    import _hashlib
+except ImportError:
+    _hashlib = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Module logger, since logging through the root logger would configure it
+_logger = logging.getLogger(__name__)
 
 
 class HashAlgorithm(Enum):
+    """Supported hash algorithms
+
+    Digests differ between algorithms, so switching algorithms changes all hashes.
+    BLAKE2B and XXH3 (if xxhash is installed) are faster than the SHA-2 family and
+    suitable for content addressing, but XXH3 is not a cryptographic hash.
+
+    SHA-2 digests are only fast if hashlib uses OpenSSL and the CPU has SHA
+    extensions (see sha_ni_available()); a warning is logged once otherwise, and
+    BLAKE2B is worth considering"""
+
     SHA256 = hashlib.sha256
     SHA384 = hashlib.sha384
     SHA512 = hashlib.sha512
+    BLAKE2B = hashlib.blake2b
+
+    if xxhash is not None:
+        XXH3 = xxhash.xxh3_128
+
+
+# Constructors that accept hashlib's usedforsecurity keyword
+_USEDFORSECURITY = frozenset(
+    (hashlib.sha256, hashlib.sha384, hashlib.sha512, hashlib.blake2b)
+)
+
+_SHA2 = frozenset((hashlib.sha256, hashlib.sha384, hashlib.sha512))
+
+
+def _read_cpuinfo() -> str:
+    """Read CPU information on Linux"""
+    with open("/proc/cpuinfo", mode="r", encoding="utf-8") as infile:
+        return infile.read()
+
+
+def _sysctl(key: str) -> str:
+    """Read a sysctl value on macOS, returning an empty string if it is unknown"""
+    result = subprocess.run(["sysctl", "-n", key], capture_output=True, text=True)
+
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+
+@functools.lru_cache(maxsize=None)
+def sha_ni_available() -> bool:
+    """Check whether the CPU provides hardware SHA-256 instructions
+
+    Looks for SHA-NI on x86 and the SHA2 extension on ARM; returns False if the
+    platform cannot be probed. The result is cached after the first call"""
+    try:
+        if sys.platform.startswith("linux"):
+            for line in _read_cpuinfo().splitlines():
+                if line.startswith(("flags", "Features")):
+                    flags = line.partition(":")[2].split()
+                    return "sha_ni" in flags or "sha2" in flags
+
+        elif sys.platform == "darwin":
+            return (
+                _sysctl("hw.optional.arm.FEAT_SHA256") == "1"
+                or "SHA" in _sysctl("machdep.cpu.leaf7_features").split()
+            )
+
+    except OSError:
+        pass
+
+    return False
+
+
+_TYPES = (
+    int,
+    float,
+    str,
+    bool,
+    datetime.datetime,
+    datetime.date,
+    datetime.timedelta,
+)
+
+
+def _hash_row(constructor: Callable, values: Iterable[Any], replace_null: str) -> str:
+    """Hash a single row of values using a given hashlib constructor"""
+    if constructor in _USEDFORSECURITY:
+        _hash = constructor(usedforsecurity=True)
+    else:
+        _hash = constructor()
+
+    # Bind methods locally to avoid attribute lookups inside the loop
+    update = _hash.update
+    encode = str.encode
+
+    for value in values:
+        # Bytes are hashed as-is, which matches hashing their decoded UTF-8 string
+        if type(value) is bytes and value:
+            update(value)
+            continue
+
+        # If replace_null is defined, replace NULL values with an unlikely string
+        # to ensure that (1, None) and (None, 1) are different hashes
+        # Only empty bytes get here; check the type to avoid comparing str to bytes
+        if value is None or type(value) is bytes or value == "":
+            value = replace_null
+        else:
+            assert type(value) in _TYPES, f"Cannot cast to string, type={type(value)}"
+
+        update(encode(value if type(value) is str else str(value), "utf-8"))
+
+    return _hash.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _check_sha_backend() -> None:
+    """Log a warning once if SHA-2 digests are not hardware accelerated"""
+    if getattr(_hashlib, "openssl_sha256", None) is not hashlib.sha256:
+        _logger.warning(
+            "hashlib is not backed by OpenSSL, SHA-2 digests will be slow; "
+            "consider using HashAlgorithm.BLAKE2B"
+        )
+    elif not sha_ni_available():
+        _logger.warning(
+            "CPU does not support SHA extensions, SHA-2 digests will be slower; "
+            "consider using HashAlgorithm.BLAKE2B"
+        )
+
+
+def _constructor(algorithm: Union[HashAlgorithm, Callable]) -> Callable:
+    """Resolve a HashAlgorithm or a hashlib-style constructor to a constructor
+
+    Checks whether SHA-2 is accelerated the first time a SHA-2 constructor is used"""
+    if isinstance(algorithm, HashAlgorithm):
+        constructor = algorithm.value
+    else:
+        assert callable(algorithm), (
+            f"Algorithm needs to be one of {[x.name for x in HashAlgorithm]} "
+            "or a hashlib-style constructor"
+        )
+        constructor = algorithm
+
+    if constructor in _SHA2:
+        _check_sha_backend()
+
+    return constructor
 
 
 def hash_values(
     *args: Any,
-    algorithm: HashAlgorithm = HashAlgorithm.SHA256,
+    algorithm: Union[HashAlgorithm, Callable] = HashAlgorithm.SHA256,
     replace_null: str = "",
 ) -> str:
     """Hash various items to create consistent digests for a given value
 
-    Casts its input(s) to str, encodes it as UTF-8 bytes, then hashes it"""
-    _types = (
-        int,
-        float,
-        str,
-        bool,
-        datetime.datetime,
-        datetime.date,
-        datetime.timedelta,
-    )
-
-    assert (
-        algorithm in HashAlgorithm
-    ), f"Algorithm needs to be one of {[x.name for x in HashAlgorithm]}"
-
+    Casts its input(s) to str, encodes it as UTF-8 bytes, then hashes it. Input
+    that is already bytes is hashed directly, so b"a" and "a" produce the same
+    digest. algorithm is either a HashAlgorithm or a hashlib-style constructor,
+    such as hashlib.sha3_256"""
     try:
-        _hash = algorithm.value(usedforsecurity=True)
+        return _hash_row(_constructor(algorithm), args, replace_null)
+
+    except AssertionError as e:
+        logging.error(str(e))
+        raise e
 
-        for value in args:
-            # If replace_null is defined, replace NULL values with an unlikely string
-            # to ensure that (1, None) and (None, 1) are different hashes
-            if value is None or value == "":
-                value = replace_null
-            else:
-                assert (
-                    type(value) in _types
-                ), f"Cannot cast to string, type={type(value)}"
 
-            _hash.update(str(value).encode(encoding="utf-8"))
+def hash_rows(
+    rows: Iterable[Sequence[Any]],
+    algorithm: Union[HashAlgorithm, Callable] = HashAlgorithm.SHA256,
+    replace_null: str = "",
+) -> list[str]:
+    """Hash multiple rows of values, returning one digest per row
+
+    Equivalent to [hash_values(*row) for row in rows], but validates its arguments
+    once for all rows rather than once per row"""
+    try:
+        constructor = _constructor(algorithm)
 
-        return _hash.hexdigest()
+        return [_hash_row(constructor, row, replace_null) for row in rows]
 
     except AssertionError as e:
         logging.error(str(e))
@@ -1,4 +1,5 @@
 import datetime
+import math
 import os
 
 import pytest
@@ -74,6 +75,46 @@ def test_jsonify_types() -> None:
     assert rows_jsonified == rows_expected
 
 
+def test_jsonify_types_subclass() -> None:
+    """Check that subclasses of castable types are cast like their parent types"""
+
+    class Timestamp(datetime.datetime):
+        pass
+
+    row = {"timestamp": Timestamp(2020, 2, 28, 12, 24, 48), "int": 1}
+    row_expected = {"timestamp": "2020-02-28T12:24:48.000000", "int": 1}
+
+    assert rmk2.file._jsonify_types(row) == row_expected
+
+
+@pytest.mark.parametrize("cast", (rmk2.file._cast, rmk2.file._cast_cached))
+def test_jsonify_types_timezones(cast) -> None:
+    """Check that equal datetimes in different time zones keep their own offsets"""
+    value_utc = datetime.datetime(2020, 2, 28, 12, tzinfo=datetime.timezone.utc)
+    value_cet = value_utc.astimezone(datetime.timezone(datetime.timedelta(hours=1)))
+
+    rows = [{"datetime": value_utc}, {"datetime": value_cet}]
+    rows_expected = [
+        {"datetime": "2020-02-28T12:00:00.000000+00:00"},
+        {"datetime": "2020-02-28T13:00:00.000000+01:00"},
+    ]
+
+    assert value_utc == value_cet
+    assert [rmk2.file._jsonify_types(x, cast) for x in rows] == rows_expected
+
+
+def test_jsonify_pairs() -> None:
+    """Check that casting key/value pairs matches casting the equivalent dict"""
+    pairs = [
+        ("date", datetime.date(2020, 2, 28)),
+        ("timedelta", datetime.timedelta(days=2)),
+        ("int", 1),
+        ("str", "1"),
+    ]
+
+    assert rmk2.file._jsonify_pairs(pairs) == rmk2.file._jsonify_types(dict(pairs))
+
+
 def test_write_jsonl_create(tmpdir) -> None:
     """Check that writing a JSONL file meets expectations"""
     filename = "test.json"
@@ -152,6 +193,150 @@ def test_write_jsonl_create_exception(tmpdir) -> None:
     assert e
 
 
+@pytest.mark.parametrize("cache_dates", (False, True))
+def test_write_jsonl_cache_dates(tmpdir, cache_dates) -> None:
+    """Check that writing repeated dates with or without caching is equivalent"""
+    filename = "test.json"
+
+    data = [{"n": n, "date": datetime.date(2020, 2, 28)} for n in range(0, 10000)]
+
+    rmk2.file.write_jsonl(
+        data=data, prefix=tmpdir, filename=filename, cache_dates=cache_dates
+    )
+
+    data_read = list(rmk2.file.read_jsonl(prefix=tmpdir, filename=filename))
+
+    assert data_read == [rmk2.file._jsonify_types(x) for x in data]
+
+
+@pytest.mark.parametrize("cast_types", (True, False))
+def test_write_jsonl_cast_types(tmpdir, cast_types) -> None:
+    """Check that writing JSON-native rows with or without casting is equivalent"""
+    filename = "test.json"
+
+    data = [[("a", 1), ("b", "2"), ("c", None)], {"d": 4.0, "e": True, "f": "6"}]
+
+    rmk2.file.write_jsonl(
+        data=data, prefix=tmpdir, filename=filename, cast_types=cast_types
+    )
+
+    data_read = list(rmk2.file.read_jsonl(prefix=tmpdir, filename=filename))
+
+    assert data_read == [dict(x) for x in data]
+
+
+def test_write_jsonl_json_compatible(tmpdir) -> None:
+    """Check that values supported by the json module are written and read back"""
+    filename = "test.json"
+
+    data = [
+        {1: 2, 1.5: 3, None: 4},
+        {True: 5},
+        {"int": 2**70 + 1, "negative": -(2**70), "list": [2**64]},
+        {"nan": float("nan"), "inf": float("inf"), "nested": [float("-inf")]},
+    ]
+
+    rmk2.file.write_jsonl(data=data, prefix=tmpdir, filename=filename)
+
+    data_read = list(
+        rmk2.file.read_jsonl(prefix=tmpdir, filename=filename, exact_ints=True)
+    )
+
+    assert data_read[0] == {"1": 2, "1.5": 3, "null": 4}
+    assert data_read[1] == {"true": 5}
+    assert data_read[2] == data[2]
+    assert type(data_read[2]["int"]) is int
+    assert math.isnan(data_read[3]["nan"])
+    assert data_read[3]["inf"] == float("inf")
+    assert data_read[3]["nested"] == [float("-inf")]
+
+
+def test_write_jsonl_surrogates(tmpdir) -> None:
+    """Check that strings that cannot be encoded as UTF-8 are written escaped"""
+    filename = "test.json"
+
+    data = [{"a": "\ud800", "b": "æøþð"}, {"c": "\udfff"}]
+
+    rmk2.file.write_jsonl(data=data, prefix=tmpdir, filename=filename)
+
+    with open(os.path.join(tmpdir, filename), mode="rb") as infile:
+        assert infile.read() == (
+            b'{"a":"\\ud800","b":"\\u00e6\\u00f8\\u00fe\\u00f0"}\n{"c":"\\udfff"}\n'
+        )
+
+    data_read = list(rmk2.file.read_jsonl(prefix=tmpdir, filename=filename))
+
+    assert data_read == data
+
+
+def test_write_jsonl_date_keys_exception(tmpdir) -> None:
+    """Check that writing dates as keys produces an exception"""
+    data = [{datetime.date(2020, 2, 28): 1}]
+
+    with pytest.raises(TypeError) as e:
+        rmk2.file.write_jsonl(data=data, prefix=tmpdir, filename="test.json")
+
+    assert e
+
+
+def test_write_jsonl_nested_date_exception(tmpdir) -> None:
+    """Check that writing dates nested in other values produces an exception"""
+    data = [{"a": [datetime.date(2020, 2, 28)]}]
+
+    with pytest.raises(TypeError) as e:
+        rmk2.file.write_jsonl(data=data, prefix=tmpdir, filename="test.json")
+
+    assert e
+
+
+def test_write_jsonl_circular_exception(tmpdir) -> None:
+    """Check that writing self-referencing values produces an exception"""
+    value = []
+    value.append(value)
+
+    with pytest.raises(ValueError) as e:
+        rmk2.file.write_jsonl(data=[{"a": value}], prefix=tmpdir, filename="test.json")
+
+    assert e
+
+
+def test_write_jsonl_backends(tmpdir, monkeypatch) -> None:
+    """Check that the written file does not depend on the JSON backend in use"""
+    data = [
+        {"a": 1, "b": "æøþð", "c": [1.5, None, True], "d": {"e": 2**70}},
+        [("f", datetime.date(2020, 2, 28)), ("g", float("nan"))],
+    ]
+
+    rmk2.file.write_jsonl(data=data, prefix=tmpdir, filename="default.json")
+
+    monkeypatch.setattr(rmk2.file, "_dumps", rmk2.file._json_dumps)
+    rmk2.file.write_jsonl(data=data, prefix=tmpdir, filename="json.json")
+
+    with open(os.path.join(tmpdir, "default.json"), mode="rb") as infile:
+        data_default = infile.read()
+
+    with open(os.path.join(tmpdir, "json.json"), mode="rb") as infile:
+        data_json = infile.read()
+
+    assert data_default == data_json
+
+
+def test_write_jsonl_invalid_row(tmpdir) -> None:
+    """Check that rows before an invalid row are written before raising"""
+    filename = "test.json"
+
+    data = [{"a": 1}, [("b", 2)], "c", {"d": 4}]
+
+    with pytest.raises(ValueError) as e:
+        rmk2.file.write_jsonl(data=data, prefix=tmpdir, filename=filename)
+
+    assert e
+
+    data_read = list(rmk2.file.read_jsonl(prefix=tmpdir, filename=filename))
+
+    assert data_read == [{"a": 1}, {"b": 2}]
+
+
 def test_read_jsonl(tmpdir) -> None:
     """Check that reading JSONL files meets expectations"""
     filename = "test.json"
@@ -193,3 +378,48 @@ def test_count_extract(tmpdir, lines) -> None:
     lines_counted = rmk2.file.count_file(prefix=tmpdir, filename=filename)
 
     assert lines_counted == lines
+
+
+def test_count_extract_unterminated(tmpdir) -> None:
+    """Check that counting lines without a trailing newline meets expectations"""
+    filename = "test.json"
+
+    with open(os.path.join(tmpdir, filename), mode="x") as outfile:
+        outfile.write(os.linesep.join(str(n) for n in range(0, 10)))
+
+    lines_counted = rmk2.file.count_file(prefix=tmpdir, filename=filename)
+
+    assert lines_counted == 10
+
+
+@pytest.mark.parametrize("buffer_size", (1, 1 << 10))
+def test_count_extract_blocks(tmpdir, buffer_size) -> None:
+    """Check that counting lines across block boundaries meets expectations"""
+    filename = "test.json"
+    lines = 12345
+
+    with open(os.path.join(tmpdir, filename), mode="x") as outfile:
+        for n in range(0, lines):
+            outfile.write(str(n))
+            outfile.write(os.linesep)
+
+    lines_counted = rmk2.file.count_file(
+        prefix=tmpdir, filename=filename, buffer_size=buffer_size
+    )
+
+    assert lines_counted == lines
+
+
+@pytest.mark.parametrize("buffer_size", (0, -1))
+def test_count_extract_buffer_size_exception(tmpdir, buffer_size) -> None:
+    """Check that counting lines with a non-positive block size produces an exception"""
+    filename = "test.json"
+
+    with open(os.path.join(tmpdir, filename), mode="x") as outfile:
+        outfile.write("a")
+        outfile.write(os.linesep)
+
+    with pytest.raises(ValueError) as e:
+        rmk2.file.count_file(prefix=tmpdir, filename=filename, buffer_size=buffer_size)
+
+    assert e
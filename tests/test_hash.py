@@ -1,14 +1,24 @@
 import datetime
 import hashlib
+import os
+import subprocess
+import sys
 
-from rmk2.hash import hash_values, HashAlgorithm
+import rmk2.hash
+from rmk2.hash import hash_rows, hash_values, sha_ni_available, HashAlgorithm
 
 import pytest
 
 
 @pytest.mark.parametrize("value", [1, 42.1, "a", ""])
 @pytest.mark.parametrize(
-    "algorithm", [HashAlgorithm.SHA256, HashAlgorithm.SHA384, HashAlgorithm.SHA512]
+    "algorithm",
+    [
+        HashAlgorithm.SHA256,
+        HashAlgorithm.SHA384,
+        HashAlgorithm.SHA512,
+        HashAlgorithm.BLAKE2B,
+    ],
 )
 def test_hash_algorithms(algorithm, value) -> None:
     """Check that hashes for different algorithms meet expectations"""
@@ -22,6 +32,40 @@ def test_hash_algorithms(algorithm, value) -> None:
     assert hash_direct == hash_import
 
 
+def test_hash_algorithm_xxh3() -> None:
+    """Check that hashes for the optional XXH3 algorithm meet expectations"""
+    xxhash = pytest.importorskip("xxhash")
+
+    _hash = xxhash.xxh3_128()
+    _hash.update("a".encode("utf-8"))
+    hash_direct = _hash.hexdigest()
+
+    hash_import = hash_values("a", algorithm=HashAlgorithm.XXH3)
+
+    assert hash_direct == hash_import
+
+
+@pytest.mark.parametrize("algorithm", [hashlib.sha256, hashlib.blake2b, hashlib.md5])
+def test_hash_algorithm_constructor(algorithm) -> None:
+    """Check that passing a hashlib constructor directly meets expectations"""
+    hash_direct = algorithm("a".encode("utf-8")).hexdigest()
+
+    hash_import = hash_values("a", algorithm=algorithm)
+
+    assert hash_direct == hash_import
+
+
+@pytest.mark.parametrize(
+    "function", [lambda x: hash_values("a", algorithm=x), lambda x: hash_rows([], x)]
+)
+def test_hash_algorithm_invalid(caplog, function) -> None:
+    """Check that passing an invalid algorithm produces a logged exception"""
+    with pytest.raises(AssertionError):
+        function("sha256")
+
+    assert "Algorithm needs to be one of" in caplog.text
+
+
 def test_hash_values_single() -> None:
     """Check that direct and computed hashes for a single value meets expectations"""
     value = 1
@@ -91,6 +135,33 @@ def test_hash_values_types() -> None:
     assert hash_str == hash_int == hash_bytes
 
 
+def test_hash_values_bytes() -> None:
+    """Check that hashing bytes matches hashing the equivalent string"""
+    value_str = "æøþð"
+    value_bytes = value_str.encode("utf-8")
+
+    _hash = hashlib.sha256()
+    _hash.update(value_bytes)
+    hash_direct = _hash.hexdigest()
+
+    hash_str = hash_values(value_str, algorithm=HashAlgorithm.SHA256)
+    hash_bytes = hash_values(value_bytes, algorithm=HashAlgorithm.SHA256)
+
+    assert hash_str == hash_bytes == hash_direct
+    assert hash_values(b"", replace_null="a") == hash_values("", replace_null="a")
+
+
+def test_hash_values_bytes_warning() -> None:
+    """Check that hashing does not compare str to bytes, which fails under -bb"""
+    code = (
+        "from rmk2.hash import hash_values; "
+        "hash_values('a', 1, b'', b'a', '', None, replace_null='x')"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    subprocess.run([sys.executable, "-bb", "-c", code], cwd=root, check=True)
+
+
 def test_hash_values_timestamps() -> None:
     """Check that hashing datetime objects meets expectations"""
     value_datetime = datetime.datetime(2018, 10, 28, 21, 42, 0)
@@ -211,3 +282,103 @@ def test_hash_values_replace_null() -> None:
         != hash_values(1, None, 2, replace_null=replace_null)
         != hash_values(None, 1, 2, replace_null=replace_null)
     )
+
+
+def test_hash_rows() -> None:
+    """Check that hashing multiple rows matches hashing each row individually"""
+    rows = [(1, "a"), ("a", 1), (None, datetime.date(2020, 2, 28)), ()]
+
+    hash_rows_expected = [hash_values(*row) for row in rows]
+    hash_rows_import = hash_rows(rows, algorithm=HashAlgorithm.SHA256)
+
+    assert hash_rows_import == hash_rows_expected
+    assert len(set(hash_rows_import)) == len(rows)
+
+
+@pytest.mark.parametrize(
+    "cpuinfo,expected",
+    [
+        ("processor\t: 0\nflags\t\t: fpu sse2 avx2 sha_ni\n", True),
+        ("processor\t: 0\nflags\t\t: fpu sse2 avx2\n", False),
+        ("processor\t: 0\nFeatures\t: fp asimd sha1 sha2\n", True),
+        ("processor\t: 0\n", False),
+    ],
+)
+def test_sha_ni_available_linux(monkeypatch, cpuinfo, expected) -> None:
+    """Check that probing /proc/cpuinfo for SHA CPU extensions meets expectations"""
+    monkeypatch.setattr(rmk2.hash.sys, "platform", "linux")
+    monkeypatch.setattr(rmk2.hash, "_read_cpuinfo", lambda: cpuinfo)
+    sha_ni_available.cache_clear()
+
+    try:
+        assert sha_ni_available() is expected
+    finally:
+        sha_ni_available.cache_clear()
+
+
+@pytest.mark.parametrize(
+    "sysctl,expected",
+    [
+        ({"hw.optional.arm.FEAT_SHA256": "1"}, True),
+        ({"machdep.cpu.leaf7_features": "RDSEED ADX SHA AVX512F"}, True),
+        ({"machdep.cpu.leaf7_features": "RDSEED ADX AVX512F"}, False),
+        ({}, False),
+    ],
+)
+def test_sha_ni_available_darwin(monkeypatch, sysctl, expected) -> None:
+    """Check that probing sysctl for SHA CPU extensions meets expectations"""
+    monkeypatch.setattr(rmk2.hash.sys, "platform", "darwin")
+    monkeypatch.setattr(rmk2.hash, "_sysctl", lambda key: sysctl.get(key, ""))
+    sha_ni_available.cache_clear()
+
+    try:
+        assert sha_ni_available() is expected
+    finally:
+        sha_ni_available.cache_clear()
+
+
+@pytest.mark.parametrize(
+    "openssl,sha_ni,message",
+    [
+        (False, True, "not backed by OpenSSL"),
+        (True, False, "does not support SHA extensions"),
+        (True, True, None),
+    ],
+)
+def test_check_sha_backend(caplog, monkeypatch, openssl, sha_ni, message) -> None:
+    """Check that a missing SHA-2 acceleration is logged once, on first use"""
+    if not openssl:
+        monkeypatch.setattr(rmk2.hash, "_hashlib", None)
+    monkeypatch.setattr(rmk2.hash, "sha_ni_available", lambda: sha_ni)
+    rmk2.hash._check_sha_backend.cache_clear()
+
+    try:
+        hash_values("a", algorithm=HashAlgorithm.BLAKE2B)
+        assert not caplog.records
+
+        hash_values("a", algorithm=HashAlgorithm.SHA256)
+        hash_rows([("a",)], algorithm=hashlib.sha512)
+    finally:
+        rmk2.hash._check_sha_backend.cache_clear()
+
+    if message is None:
+        assert not caplog.records
+    else:
+        assert len(caplog.records) == 1
+        assert caplog.records[0].levelname == "WARNING"
+        assert caplog.records[0].name == "rmk2.hash"
+        assert message in caplog.text
+
+
+def test_import_side_effects() -> None:
+    """Check that importing and hashing do not configure the root logger"""
+    code = (
+        "import logging, rmk2.hash; "
+        "rmk2.hash.sha_ni_available = lambda: False; "
+        "rmk2.hash.hash_values('a'); "
+        "assert not logging.getLogger().handlers, logging.getLogger().handlers"
+    )
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)